@@ -10,57 +10,215 @@ from discord.ext import commands
 from discord import app_commands
 import asyncio
 import os
+import sys
+import re
 from typing import Optional, List, Dict
 from collections import defaultdict
 import traceback
-from PIL import Image, ImageDraw, ImageFont
+import time
+import functools
+import heapq
+from PIL import Image, ImageDraw, ImageFont, features
 import io
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 # Import de l'analyseur
-from warframe_drop_analyzer import WarframeDropAnalyzer
+from warframe_drop_analyzer import WarframeDropAnalyzer, BY_DROP_RATE
 
 # Configuration
 TOKEN = os.getenv('DISCORD_BOT_TOKEN')  # À définir dans les variables d'environnement
+# Serveur de développement (optionnel) : sync limitée à ce serveur, visible immédiatement
+DEV_GUILD_ID = os.getenv('DISCORD_DEV_GUILD_ID')
+# Empreinte des commandes déjà synchronisées (évite une sync globale à chaque démarrage)
+COMMAND_SYNC_HASH_PATH = os.getenv('COMMAND_SYNC_HASH_PATH', '.command_sync_hash')
 INTENTS = discord.Intents.default()
 INTENTS.message_content = True
 
 bot = commands.Bot(command_prefix='!', intents=INTENTS)
 
+# Mots-clés identifiant un composant spécifique (une seule passe regex au lieu de 11 recherches)
+COMPONENT_KEYWORD_RE = re.compile(
+    r'(?:Blueprint|Chassis|Neuroptics|Systems|Barrel|Receiver|Stock|Blade|Handle|Guard|Hilt)'
+)
+
+# Composants par type d'équipement (constantes : pas de réallocation à chaque /prime)
+TYPE_PATTERNS = {
+    'warframe': ('Blueprint', 'Chassis Blueprint', 'Neuroptics Blueprint', 'Systems Blueprint'),
+    'primary': ('Blueprint', 'Stock', 'Barrel', 'Receiver'),
+    'secondary': ('Blueprint', 'Barrel', 'Receiver')
+}
+# Pour melee : Blade/Hilt si les deux existent, sinon Blade/Handle/Guard
+MELEE_BLADE_HILT_PARTS = ('Blueprint', 'Blade', 'Hilt')
+MELEE_HANDLE_GUARD_PARTS = ('Blueprint', 'Blade', 'Handle', 'Guard')
+
+# Gabarits des lignes de Top (définis une fois, remplis via str.format)
+TOP_LINE_MOD = (
+    "**{idx}.** {mission} ({planet})\n"
+    "   • Type: {type}\n"
+    "   • Rotation: {rotation}\n"
+    "   • Drop: **{drop_rate:.2f}%** ({rarity})\n\n"
+)
+TOP_LINE_PRIME = (
+    "**{idx}.** {mission} ({planet})\n"
+    "   • Type: {type} - {rotation}\n"
+    "   • Drop: **{drop_rate:.2f}%**\n"
+)
+
+# Limite Discord ~2000 caractères, on garde une marge
+MAX_MESSAGE_LENGTH = 1900
+
 # Instance globale de l'analyseur
 analyzer = None
 
+# Threads réservés aux recherches de l'analyseur (taille bornée, séparés du pool par défaut
+# qui sert au téléchargement des droptables et au rendu des images)
+ANALYZER_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='analyzer')
+
+# Génération des droptables : incrémentée à chaque (re)chargement pour invalider les caches
+analyzer_generation = 0
+
+# Cache LRU des analyses rendues {(genre, item, type, filtres, génération): résultat}
+# (genre 'image' : octets de l'image récapitulative encodée)
+# Les droptables ne changent qu'au /reload, qui vide ce cache
+analysis_cache: Dict[tuple, object] = {}
+ANALYSIS_CACHE_SIZE = 256
+analysis_cache_stats = {'hits': 0, 'misses': 0}
+
+# Analyses complètes en cours {(item, type, filtres, génération): Task}
+inflight_analyses: Dict[tuple, asyncio.Task] = {}
+
+# Items Prime les plus demandés, pré-calculés après chaque (re)chargement
+POPULAR_PRIMES = (
+    ('Gauss Prime', 'warframe'),
+    ('Mesa Prime', 'warframe'),
+    ('Octavia Prime', 'warframe'),
+    ('Wisp Prime', 'warframe'),
+    ('Saryn Prime', 'warframe'),
+    ('Acceltra Prime', 'primary'),
+    ('Nikana Prime', 'melee'),
+    ('Lex Prime', 'secondary'),
+)
+
+# Tâche de pré-chauffage en cours (référence gardée pour éviter son ramasse-miettes)
+prewarm_task: Optional[asyncio.Task] = None
+
 
 # Pas de classes pour boutons - on utilise un paramètre filters direct
 
 
+def needs_analyzer(func):
+    """
+    Décorateur des commandes d'analyse : vérifie que l'analyseur est chargé, defer,
+    mesure la durée et renvoie les erreurs à l'utilisateur
+    """
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        # Test instantané : réponse éphémère immédiate, sans passer par "réfléchit..."
+        if not analyzer or not analyzer.is_ready():
+            await interaction.response.send_message(
+                "❌ Bot non initialisé. Réessayez dans quelques secondes.", ephemeral=True
+            )
+            return
+        
+        try:
+            await interaction.response.defer(thinking=True)
+        except discord.NotFound:
+            # Fenêtre de 3s dépassée (10062 Unknown interaction) : plus rien à répondre
+            print(f"⚠️ /{func.__name__.removesuffix('_command')}: interaction expirée avant le defer")
+            return
+        
+        start = time.perf_counter()
+        try:
+            return await func(interaction, *args, **kwargs)
+        except Exception as e:
+            # Trace complète dans les logs, seul le type + message est envoyé à l'utilisateur
+            traceback.print_exc()
+            error_detail = "".join(traceback.format_exception_only(type(e), e))[:500]
+            error_msg = f"❌ Erreur: {str(e)}\n```{error_detail}```"
+            await interaction.followup.send(error_msg)
+        finally:
+            print(f"⏱️ /{func.__name__.removesuffix('_command')}: {(time.perf_counter() - start) * 1000:.1f}ms")
+    
+    return wrapper
+
+
+async def run_analyzer(func, *args):
+    """Exécute une recherche bloquante de l'analyseur dans ANALYZER_POOL"""
+    return await asyncio.get_running_loop().run_in_executor(ANALYZER_POOL, func, *args)
+
+
+def parse_filters(filters: Optional[str]) -> tuple:
+    """
+    Découpe le paramètre filters ('Spy, Defense') en termes, une seule fois par commande
+    Les termes vides ('Spy,,Defense') sont ignorés : ils excluaient toutes les missions
+    Les termes sont internés, la casse d'origine est gardée pour l'affichage
+    """
+    if not filters:
+        return ()
+    return tuple(sys.intern(term) for term in (f.strip() for f in filters.split(',')) if term)
+
+
 @bot.event
 async def on_ready():
     """Initialisation du bot"""
-    global analyzer
     print(f'✅ Bot connecté en tant que {bot.user}')
     print(f'📊 Serveurs: {len(bot.guilds)}')
     
-    # Charge les droptables au démarrage
+    # Charge les droptables au démarrage (dans un thread pour ne pas bloquer le gateway)
     print('📥 Chargement des droptables Warframe...')
-    analyzer = WarframeDropAnalyzer()
-    if analyzer.fetch_droptables():
+    new_analyzer = WarframeDropAnalyzer()
+    if await asyncio.to_thread(new_analyzer.fetch_droptables):
+        install_analyzer(new_analyzer)
         print('✅ Droptables chargées!')
     else:
         print('❌ Erreur de chargement des droptables')
     
-    # Synchronise les slash commands
+    # Synchronise les slash commands (seulement si elles ont changé)
     try:
-        synced = await bot.tree.sync()
-        print(f'✅ {len(synced)} commandes synchronisées')
+        await sync_commands()
     except Exception as e:
         print(f'❌ Erreur de synchronisation: {e}')
 
 
+async def sync_commands():
+    """
+    Synchronise les slash commands avec Discord, uniquement si leur définition a changé
+    depuis la dernière synchronisation (empreinte SHA-1 enregistrée sur disque)
+    L'empreinte inclut l'application : un autre token dans le même dossier resynchronise
+    """
+    guild = discord.Object(id=int(DEV_GUILD_ID)) if DEV_GUILD_ID else None
+    if guild:
+        bot.tree.copy_global_to(guild=guild)
+    
+    payload = json.dumps([c.to_dict() for c in bot.tree.get_commands(guild=guild)], sort_keys=True)
+    digest = hashlib.sha1(f"{bot.application_id}:{DEV_GUILD_ID}:{payload}".encode('utf-8')).hexdigest()
+    
+    try:
+        with open(COMMAND_SYNC_HASH_PATH, encoding='utf-8') as f:
+            if f.read().strip() == digest:
+                print('✅ Commandes inchangées, synchronisation ignorée')
+                return
+    except OSError:
+        pass
+    
+    synced = await bot.tree.sync(guild=guild)
+    print(f'✅ {len(synced)} commandes synchronisées')
+    
+    try:
+        with open(COMMAND_SYNC_HASH_PATH, 'w', encoding='utf-8') as f:
+            f.write(digest)
+    except OSError as e:
+        print(f"⚠️ Impossible d'enregistrer l'empreinte des commandes: {e}")
+
+
 @bot.tree.command(name="prime", description="Analyse un item Prime (warframe ou arme)")
 @app_commands.describe(
     item="Nom de l'item Prime (ex: Gauss Prime, Acceltra Prime)",
     type="Type d'équipement",
-    filters="Missions à EXCLURE (ex: 'Spy,Defense,Duviri,Event')"
+    filters="Missions à EXCLURE (ex: 'Spy,Defense,Duviri,Event')",
+    image="Joindre l'image récapitulative (False : réponse texte seule, plus rapide)"
 )
 @app_commands.choices(type=[
     app_commands.Choice(name="Warframe", value="warframe"),
@@ -68,49 +226,50 @@ async def on_ready():
     app_commands.Choice(name="Arme Melee", value="melee"),
     app_commands.Choice(name="Arme Secondary", value="secondary"),
 ])
+@needs_analyzer
 async def prime_command(
     interaction: discord.Interaction,
     item: str,
     type: Optional[app_commands.Choice[str]] = None,
-    filters: Optional[str] = None
+    filters: Optional[str] = None,
+    image: bool = True
 ):
     """Commande /prime pour analyser un item Prime"""
-    await interaction.response.defer(thinking=True)
+    filter_list = parse_filters(filters)
     
-    try:
-        if not analyzer or not analyzer.soup:
-            await interaction.followup.send("❌ Bot non initialisé. Réessayez dans quelques secondes.")
-            return
-        
-        # Parse les filtres
-        filter_list = []
-        if filters:
-            filter_list = [f.strip() for f in filters.split(',')]
-        
-        # Détermine si c'est un composant spécifique ou un item complet
-        is_specific = any(keyword in item for keyword in [
-            'Blueprint', 'Chassis', 'Neuroptics', 'Systems',
-            'Barrel', 'Receiver', 'Stock', 'Blade', 'Handle', 'Guard', 'Hilt'
-        ])
+    # Détermine si c'est un composant spécifique ou un item complet
+    is_specific = bool(COMPONENT_KEYWORD_RE.search(item))
+    
+    if is_specific or not type:
+        # Analyse directe d'un composant
+        result = await analyze_single_component(item, filter_list)
+        await send_long_message(interaction, result)
+    else:
+        # Analyse complète avec type et filtres ; sa clé de cache est calculée avant toute attente,
+        # avec cette génération : l'image récap est rangée sous la même, même si un /reload intervient
+        generation = analyzer_generation
+        result, component_data = await analyze_complete_prime_with_filters(
+            item, type.value, filter_list
+        )
+        # Le rendu de l'image récap tourne pendant l'envoi du texte ; elle est postée
+        # après, pour garder l'ordre des messages
+        rendering = (
+            start_summary_render(item, type.value, component_data, filter_list, generation)
+            if image and component_data else None
+        )
         
-        if is_specific or not type:
-            # Analyse directe d'un composant
-            result = await analyze_single_component(item, filter_list)
-            await send_long_message(interaction, result)
-        else:
-            # Analyse complète avec type et filtres
-            result, component_data = await analyze_complete_prime_with_filters(
-                item, type.value, filter_list
-            )
-            await send_long_message(interaction, result)
-            
-            # Génère et envoie les images récapitulatives
-            if component_data:
-                await send_summary_images(interaction, item, component_data, filter_list)
+        # Tout passe par le followup de l'interaction : même route que l'image récap,
+        # donc pas de mélange followup/channel.send ni de permission salon requise
+        try:
+            await send_long_message(interaction, result, via_channel=False)
+        except Exception:
+            if rendering:
+                rendering.cancel()
+            raise
         
-    except Exception as e:
-        error_msg = f"❌ Erreur: {str(e)}\n```{traceback.format_exc()[:500]}```"
-        await interaction.followup.send(error_msg)
+        # Envoie l'image récapitulative
+        if rendering:
+            await send_summary_images(interaction, item, rendering)
 
 
 @bot.tree.command(name="mod", description="Analyse un mod Warframe")
@@ -118,58 +277,41 @@ async def prime_command(
     mod="Nom du mod (ex: Serration, Steel Fiber)",
     filters="Filtres à appliquer (ex: 'Spy, Duviri')"
 )
+@needs_analyzer
 async def mod_command(
     interaction: discord.Interaction,
     mod: str,
     filters: Optional[str] = None
 ):
     """Commande /mod pour analyser un mod"""
-    await interaction.response.defer(thinking=True)
+    filter_list = parse_filters(filters)
     
-    try:
-        if not analyzer or not analyzer.soup:
-            await interaction.followup.send("❌ Bot non initialisé. Réessayez dans quelques secondes.")
-            return
-        
-        # Parse les filtres
-        filter_list = []
-        if filters:
-            filter_list = [f.strip() for f in filters.split(',')]
-        
-        # Trouve les missions
-        all_missions = analyzer.find_mod_in_missions(mod)
-        
-        if not all_missions:
-            await interaction.followup.send(f"⚠️ Mod '{mod}' non trouvé dans les droptables.")
-            return
-        
-        # Applique les filtres
-        missions = analyzer.apply_mission_filters(all_missions, filter_list)
-        
-        if not missions:
-            await interaction.followup.send("⚠️ Toutes les missions ont été exclues par les filtres.")
-            return
-        
-        # Trie par drop rate
-        missions.sort(key=lambda x: x['drop_rate'], reverse=True)
-        
-        # Construit le message
-        result = f"# 🔧 {mod}\n\n"
-        result += f"**{len(missions)} missions trouvées**\n\n"
-        
-        # Top 10
-        result += "## ⭐ Top 10 Missions\n"
-        for idx, farm in enumerate(missions[:10], 1):
-            result += f"**{idx}.** {farm['mission']} ({farm['planet']})\n"
-            result += f"   • Type: {farm['type']}\n"
-            result += f"   • Rotation: {farm['rotation']}\n"
-            result += f"   • Drop: **{farm['drop_rate']:.2f}%** ({farm['rarity']})\n\n"
-        
-        await send_long_message(interaction, result)
-        
-    except Exception as e:
-        error_msg = f"❌ Erreur: {str(e)}\n```{traceback.format_exc()[:500]}```"
-        await interaction.followup.send(error_msg)
+    # Trouve les missions
+    all_missions = await run_analyzer(analyzer.find_mod_in_missions, mod)
+    
+    if not all_missions:
+        await interaction.followup.send(f"⚠️ Mod '{mod}' non trouvé dans les droptables.")
+        return
+    
+    # Applique les filtres
+    missions = await run_analyzer(analyzer.apply_mission_filters, all_missions, filter_list)
+    
+    if not missions:
+        await interaction.followup.send("⚠️ Toutes les missions ont été exclues par les filtres.")
+        return
+    
+    # Sélection partielle des meilleurs drop rates (pas besoin de tout trier)
+    top_missions = heapq.nlargest(10, missions, key=BY_DROP_RATE)
+    
+    # Construit le message
+    out = [f"# 🔧 {mod}\n\n"]
+    out.append(f"**{len(missions)} missions trouvées**\n\n")
+    
+    # Top 10
+    out.append("## ⭐ Top 10 Missions\n")
+    out.extend(TOP_LINE_MOD.format(idx=idx, **farm) for idx, farm in enumerate(top_missions, 1))
+    
+    await send_long_message(interaction, "".join(out))
 
 
 @bot.tree.command(name="reload", description="Recharge les droptables Warframe (admin uniquement)")
@@ -183,11 +325,14 @@ async def reload_command(interaction: discord.Interaction):
     await interaction.response.defer(thinking=True)
     
     try:
-        global analyzer
         print('📥 Rechargement des droptables...')
-        analyzer = WarframeDropAnalyzer()
+        # Charge dans une nouvelle instance : l'ancienne continue de servir les requêtes
+        new_analyzer = WarframeDropAnalyzer()
         
-        if analyzer.fetch_droptables():
+        # Téléchargement + parsing dans un thread : le bot reste réactif pendant le rechargement
+        # /reload revalide toujours auprès du serveur, même si la copie locale est récente
+        if await asyncio.to_thread(new_analyzer.fetch_droptables, force=True):
+            install_analyzer(new_analyzer)
             await interaction.followup.send("✅ Droptables rechargées avec succès!")
         else:
             await interaction.followup.send("❌ Erreur lors du rechargement des droptables.")
@@ -195,10 +340,32 @@ async def reload_command(interaction: discord.Interaction):
         await interaction.followup.send(f"❌ Erreur: {str(e)}")
 
 
-@bot.tree.command(name="help", description="Affiche l'aide du bot")
-async def help_command(interaction: discord.Interaction):
-    """Commande /help"""
-    help_text = """
+@bot.tree.command(name="cachestats", description="Statistiques des caches du bot (admin uniquement)")
+async def cachestats_command(interaction: discord.Interaction):
+    """Commande /cachestats pour suivre le taux de succès des caches"""
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Commande réservée aux administrateurs.", ephemeral=True)
+        return
+    
+    def format_stats(name: str, hits: int, misses: int, size: int, maxsize: int) -> str:
+        total = hits + misses
+        rate = hits / total * 100 if total else 0.0
+        return f"• **{name}** : {size}/{maxsize} entrées - {hits} succès / {total} ({rate:.1f}%)\n"
+    
+    out = [f"## 📈 Caches (génération {analyzer_generation})\n\n"]
+    out.append(format_stats(
+        "Analyses rendues", analysis_cache_stats['hits'], analysis_cache_stats['misses'],
+        len(analysis_cache), ANALYSIS_CACHE_SIZE
+    ))
+    for name, cached in (("Reliques par item", _relics_lookup), ("Farms par relique", _farms_lookup)):
+        info = cached.cache_info()
+        out.append(format_stats(name, info.hits, info.misses, info.currsize, info.maxsize))
+    
+    await interaction.response.send_message("".join(out), ephemeral=True)
+
+
+# Texte de /help (construit une fois à l'import)
+HELP_TEXT = """
 # 🤖 Warframe Drop Analyzer Bot
 
 ## Commandes disponibles:
@@ -210,6 +377,7 @@ Analyse un item Prime complet ou un composant spécifique.
 • `/prime item:Gauss Prime type:Warframe`
 • `/prime item:Acceltra Prime type:Primary filters:Spy,Defense`
 • `/prime item:Gauss Prime Blueprint` (composant spécifique)
+• `/prime item:Gauss Prime type:Warframe image:False` (sans image récap)
 
 **Types disponibles:**
 • `Warframe` - Warframes Prime
@@ -241,6 +409,9 @@ Analyse un mod et trouve les meilleures missions pour le farmer.
 ### `/reload`
 Recharge les droptables (admin uniquement)
 
+### `/cachestats`
+Affiche le taux de succès des caches (admin uniquement)
+
 ### `/help`
 Affiche ce message d'aide
 
@@ -267,15 +438,152 @@ Chaque composant indique :
 • Les missions multi-composants sont mises en avant avec tous les détails
 • Les boutons de filtrage permettent de personnaliser rapidement vos résultats
     """
-    await interaction.response.send_message(help_text, ephemeral=True)
+
+
+@bot.tree.command(name="help", description="Affiche l'aide du bot")
+async def help_command(interaction: discord.Interaction):
+    """Commande /help"""
+    await interaction.response.send_message(HELP_TEXT, ephemeral=True)
 
 
 # Fonctions helper
 
+def install_analyzer(new_analyzer: WarframeDropAnalyzer):
+    """
+    Remplace l'analyseur global par une instance déjà chargée (double-buffer)
+    L'échange est atomique côté event loop : aucune commande ne voit d'analyseur à moitié chargé
+    """
+    global analyzer, prewarm_task
+    analyzer = new_analyzer
+    bump_analyzer_generation()
+    
+    # Pré-calcule les items populaires en tâche de fond (ne bloque pas l'appelant)
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+    prewarm_task = asyncio.create_task(prewarm_caches())
+
+
+async def prewarm_caches():
+    """Remplit les caches avec les analyses des items les plus demandés"""
+    start = time.perf_counter()
+    for base_name, equipment_type in POPULAR_PRIMES:
+        try:
+            await analyze_complete_prime_with_filters(base_name, equipment_type, ())
+        except Exception as e:
+            print(f"⚠️ Pré-chauffage de {base_name} impossible: {e}")
+    print(f"🔥 Caches pré-chauffés ({len(POPULAR_PRIMES)} items) en {time.perf_counter() - start:.1f}s")
+
+
+def bump_analyzer_generation():
+    """Invalide les caches de recherche après un (re)chargement de l'analyseur"""
+    global analyzer_generation
+    analyzer_generation += 1
+    _relics_lookup.cache_clear()
+    _farms_lookup.cache_clear()
+    analysis_cache.clear()
+    # Comme cache_clear() des lru_cache : les statistiques repartent de zéro
+    analysis_cache_stats.update(hits=0, misses=0)
+
+
+def analysis_cache_key(
+    kind: str, item: str, equipment_type: Optional[str], filters: list, generation: Optional[int] = None
+) -> tuple:
+    """
+    Clé de cache : les filtres gardent l'ordre saisi, car le texte rendu les répète
+    tels quels ("Filtres appliqués: Spy, Earth")
+    La génération est celle des données analysées (par défaut la génération courante)
+    """
+    if generation is None:
+        generation = analyzer_generation
+    return (kind, item, equipment_type, tuple(filters), generation)
+
+
+def get_cached_analysis(key: tuple):
+    """Retourne le résultat en cache (et le marque comme récent), ou None"""
+    result = analysis_cache.pop(key, None)
+    if result is not None:
+        analysis_cache[key] = result
+        analysis_cache_stats['hits'] += 1
+    else:
+        analysis_cache_stats['misses'] += 1
+    return result
+
+
+def cache_analysis(key: tuple, result):
+    """
+    Met un résultat en cache en évinçant l'entrée la moins récemment utilisée
+    Un résultat d'une génération périmée (analyse commencée avant un /reload) n'est pas conservé
+    """
+    if key[-1] != analyzer_generation:
+        return result
+    if len(analysis_cache) >= ANALYSIS_CACHE_SIZE:
+        analysis_cache.pop(next(iter(analysis_cache)))
+    analysis_cache[key] = result
+    return result
+
+
+@functools.lru_cache(maxsize=512)
+def _relics_lookup(source: WarframeDropAnalyzer, item_name: str, generation: int) -> Dict[str, Dict]:
+    """Cache de find_item_in_relics (voir _cached_relics)"""
+    return source.find_item_in_relics(item_name)
+
+
+@functools.lru_cache(maxsize=512)
+def _farms_lookup(source: WarframeDropAnalyzer, relic_name: str, generation: int) -> tuple:
+    """Cache de find_relic_farm_locations (voir _cached_farms)"""
+    return tuple(source.find_relic_farm_locations(relic_name))
+
+
+def _cached_relics(source: WarframeDropAnalyzer, item_name: str, generation: int) -> Dict[str, Dict]:
+    """
+    Version mise en cache de find_item_in_relics sur l'analyseur de l'analyse en cours
+    Le résultat est partagé entre les appels : ne pas le modifier
+    Une génération périmée (analyse commencée avant un /reload) ne remplit pas le cache vidé
+    """
+    if generation != analyzer_generation:
+        return source.find_item_in_relics(item_name)
+    return _relics_lookup(source, item_name, generation)
+
+
+def _cached_farms(source: WarframeDropAnalyzer, relic_name: str, generation: int) -> tuple:
+    """
+    Version mise en cache de find_relic_farm_locations (tuple immuable), comme _cached_relics
+    Les dicts retournés sont partagés : les copier avant de les enrichir
+    """
+    if generation != analyzer_generation:
+        return tuple(source.find_relic_farm_locations(relic_name))
+    return _farms_lookup(source, relic_name, generation)
+
+
+def _top_farms(source: WarframeDropAnalyzer, farms: List[Dict], filters: list, count: int) -> List[Dict]:
+    """
+    Filtre les farms (si des filtres sont donnés), les agrège par mission et garde les count meilleures
+    Synchrone : exécuté dans ANALYZER_POOL via run_analyzer
+    """
+    if filters:
+        farms = source.apply_mission_filters(farms, filters)
+    return heapq.nlargest(count, source.aggregate_mission_drops(farms), key=BY_DROP_RATE)
+
+
 async def analyze_single_component(item_name: str, filters: list) -> str:
-    """Analyse un composant Prime unique"""
+    """Analyse un composant Prime unique (rendu mis en cache jusqu'au prochain /reload)"""
+    key = analysis_cache_key('single', item_name, None, filters)
+    result = get_cached_analysis(key)
+    if result is None:
+        result = cache_analysis(key, await _analyze_single_component(analyzer, key[-1], item_name, filters))
+    return result
+
+
+async def _analyze_single_component(
+    source: WarframeDropAnalyzer, generation: int, item_name: str, filters: list
+) -> str:
+    """
+    Corps de analyze_single_component (exécuté sur un défaut de cache)
+    Toutes les recherches utilisent l'analyseur de la requête (source) et sa génération,
+    même si un /reload remplace l'analyseur global pendant l'analyse
+    """
     # Trouve les reliques
-    relics = analyzer.find_item_in_relics(item_name)
+    relics = await run_analyzer(_cached_relics, source, item_name, generation)
     
     if not relics:
         return f"⚠️ '{item_name}' non trouvé dans les reliques."
@@ -285,141 +593,212 @@ async def analyze_single_component(item_name: str, filters: list) -> str:
     vaulted_relics = []
     
     for relic, data in relics.items():
-        if analyzer.is_relic_vaulted(data):
+        if source.is_relic_vaulted(data):
             vaulted_relics.append(relic)
         else:
             active_relics.append(relic)
     
-    result = f"# 🎯 {item_name}\n\n"
-    result += f"**Reliques actives:** {len(active_relics)}\n"
-    result += f"**Reliques vaulted:** {len(vaulted_relics)}\n\n"
+    out = [f"# 🎯 {item_name}\n\n"]
+    out.append(f"**Reliques actives:** {len(active_relics)}\n")
+    out.append(f"**Reliques vaulted:** {len(vaulted_relics)}\n\n")
     
     if not active_relics:
-        result += "⚠️ Toutes les reliques sont vaulted.\n"
-        return result
+        out.append("⚠️ Toutes les reliques sont vaulted.\n")
+        return "".join(out)
     
     # Collecte les missions avec rareté de l'item dans chaque relique
+    # (recherches lancées en parallèle dans ANALYZER_POOL pour ne pas bloquer l'event loop)
+    farms_by_relic = await asyncio.gather(*(
+        run_analyzer(_cached_farms, source, relic, generation) for relic in active_relics
+    ))
+    
     all_farms = []
-    for relic in active_relics:
-        farms = analyzer.find_relic_farm_locations(relic)
+    for relic, farms in zip(active_relics, farms_by_relic):
         # Récupère la rareté de l'item dans cette relique
         relic_info = relics.get(relic, {})
         item_rarity = relic_info.get('rarity', 'Unknown')
         item_rarity_chance = relic_info.get('rarity_chance', 0.0)
         
         for farm in farms:
-            farm['relic'] = relic
-            farm['item_rarity'] = item_rarity
-            farm['item_rarity_chance'] = item_rarity_chance
-            all_farms.append(farm)
-    
-    # Applique filtres et agrège
-    if filters:
-        all_farms = analyzer.apply_mission_filters(all_farms, filters)
+            # Copie : les farms en cache ne doivent pas être modifiées
+            all_farms.append({
+                **farm,
+                'relic': relic,
+                'item_rarity': item_rarity,
+                'item_rarity_chance': item_rarity_chance
+            })
     
-    all_farms = analyzer.aggregate_mission_drops(all_farms)
-    all_farms.sort(key=lambda x: x['drop_rate'], reverse=True)
+    # Applique filtres, agrège et garde le Top 10
+    top_farms = await run_analyzer(_top_farms, source, all_farms, filters, 10)
     
     # Top 10
-    result += "## ⭐ Top 10 Missions\n\n"
-    for idx, farm in enumerate(all_farms[:10], 1):
-        relics_str = farm['relic'] if isinstance(farm['relic'], str) else ', '.join(farm['relics'])
-        result += f"**{idx}.** {farm['mission']} ({farm['planet']})\n"
-        result += f"   • Type: {farm['type']} - {farm['rotation']}\n"
-        result += f"   • Drop: **{farm['drop_rate']:.2f}%**\n"
-        if len(farm.get('relics', [])) > 1:
-            result += f"   • Reliques: {relics_str} (cumulé)\n"
+    out.append("## ⭐ Top 10 Missions\n\n")
+    for idx, farm in enumerate(top_farms, 1):
+        out.append(TOP_LINE_PRIME.format(idx=idx, **farm))
+        # Après agrégation, 'relics' est toujours la liste des reliques de la mission
+        if len(farm['relics']) > 1:
+            out.append(f"   • Reliques: {', '.join(farm['relics'])} (cumulé)\n")
         else:
             item_rarity = farm.get('item_rarity', 'Unknown')
             item_rarity_chance = farm.get('item_rarity_chance', 0.0)
-            result += f"   • Relique: {relics_str} - **{item_rarity} ({item_rarity_chance:.2f}%)**\n"
-        result += "\n"
+            out.append(f"   • Relique: {farm['relic']} - **{item_rarity} ({item_rarity_chance:.2f}%)**\n")
+        out.append("\n")
     
-    return result
+    return "".join(out)
+
+
+def _scan_component(
+    source: WarframeDropAnalyzer, component: str, comp_short: str, relics: Dict[str, Dict], generation: int, keep
+):
+    """
+    Collecte les reliques actives et les farms d'un composant
+    Synchrone : exécuté dans ANALYZER_POOL via run_analyzer
+    Les reliques sont celles déjà trouvées lors de la découverte des composants,
+    les farms exclues par les filtres (prédicat keep) ne sont pas collectées
+    
+    Returns:
+        Tuple (component, active_relics, farms, top_farms) ; top_farms : Top 3 des farms agrégées
+    """
+    active_relics = []
+    
+    # Collecte les farms avec rareté de l'item
+    farms = []
+    for relic, relic_info in relics.items():
+        if source.is_relic_vaulted(relic_info):
+            continue
+        active_relics.append(relic)
+        
+        # Récupère la rareté de l'item dans cette relique
+        item_rarity = relic_info.get('rarity', 'Unknown')
+        item_rarity_chance = relic_info.get('rarity_chance', 0.0)
+        
+        for farm in _cached_farms(source, relic, generation):
+            if not keep(farm):
+                continue
+            # Copie : les farms en cache ne doivent pas être modifiées
+            farms.append({
+                **farm,
+                'relic': relic,
+                'component': comp_short,
+                'item_rarity': item_rarity,
+                'item_rarity_chance': item_rarity_chance
+            })
+    
+    # Top 3 des farms agrégées (farms déjà filtrées), affiché et repris par l'image récap
+    top_farms = _top_farms(source, farms, (), 3)
+    return component, active_relics, farms, top_farms
 
 
 async def analyze_complete_prime_with_filters(base_name: str, equipment_type: str, filters: list):
-    """Analyse tous les composants d'un item Prime avec filtres"""
-    # Détermine les patterns selon le type
-    type_patterns = {
-        'warframe': ['Blueprint', 'Chassis Blueprint', 'Neuroptics Blueprint', 'Systems Blueprint'],
-        'primary': ['Blueprint', 'Stock', 'Barrel', 'Receiver'],
-        'secondary': ['Blueprint', 'Barrel', 'Receiver']
-    }
+    """
+    Analyse tous les composants d'un item Prime avec filtres
+    Les résultats sont mis en cache jusqu'au prochain /reload, et les appels
+    concurrents identiques attendent le résultat du premier (single-flight)
+    """
+    key = analysis_cache_key('complete', base_name, equipment_type, filters)
+    cached = get_cached_analysis(key)
+    if cached is not None:
+        return cached
+    
+    task = inflight_analyses.get(key)
+    if task is None:
+        # L'analyseur et la génération sont fixés ici, avec la clé (la tâche démarre plus tard)
+        task = asyncio.create_task(_analyze_complete_prime(analyzer, key[-1], base_name, equipment_type, filters))
+        inflight_analyses[key] = task
+        task.add_done_callback(lambda t: _finish_analysis(key, t))
+    
+    # shield : l'annulation d'un appelant n'interrompt pas l'analyse partagée
+    return await asyncio.shield(task)
+
+
+def _finish_analysis(key: tuple, task: asyncio.Task):
+    """Retire l'analyse des tâches en cours et met son résultat en cache si elle a réussi"""
+    inflight_analyses.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        cache_analysis(key, task.result())
+
+
+async def _analyze_complete_prime(
+    source: WarframeDropAnalyzer, generation: int, base_name: str, equipment_type: str, filters: list
+):
+    """
+    Corps de analyze_complete_prime_with_filters (une exécution par clé en cours)
+    Toutes les recherches utilisent l'analyseur de la requête (source) et sa génération,
+    même si un /reload remplace l'analyseur global pendant l'analyse
+    """
+    not_found = f"⚠️ Aucun composant trouvé pour {base_name} (type: {equipment_type})", {}
     
     # Pour melee, teste d'abord Blade/Hilt, sinon Blade/Handle/Guard
     if equipment_type == 'melee':
         test_parts = [f"{base_name} Blade", f"{base_name} Hilt"]
-        if all(analyzer.find_item_in_relics(p) for p in test_parts):
-            parts = ['Blueprint', 'Blade', 'Hilt']
+        probes = await asyncio.gather(*(run_analyzer(_cached_relics, source, p, generation) for p in test_parts))
+        if all(probes):
+            parts = MELEE_BLADE_HILT_PARTS
         else:
-            parts = ['Blueprint', 'Blade', 'Handle', 'Guard']
+            parts = MELEE_HANDLE_GUARD_PARTS
     else:
-        parts = type_patterns.get(equipment_type, [])
+        parts = TYPE_PATTERNS.get(equipment_type, ())
+        if not parts:
+            # Type inconnu : aucune recherche à faire
+            return not_found
     
-    # Cherche les composants
-    valid_parts = []
-    for part in parts:
-        component_name = f"{base_name} {part}"
-        relics = analyzer.find_item_in_relics(component_name)
-        if relics:
-            valid_parts.append(component_name)
+    # Cherche les composants en parallèle dans ANALYZER_POOL (les reliques trouvées sont
+    # conservées pour l'analyse) ; l'ordre des composants est préservé par gather
+    component_names = [f"{base_name} {part}" for part in parts]
+    relics_per_part = await asyncio.gather(*(
+        run_analyzer(_cached_relics, source, component_name, generation) for component_name in component_names
+    ))
+    valid_parts = [
+        (name, part, relics) for name, part, relics in zip(component_names, parts, relics_per_part) if relics
+    ]
     
     if not valid_parts:
-        return f"⚠️ Aucun composant trouvé pour {base_name} (type: {equipment_type})"
+        return not_found
     
     # Analyse chaque composant et collecte les données
     component_data = {}  # {component: {relics: [], farms: []}}
     all_farms_list = []
-    mission_components_detailed = defaultdict(list)  # {mission_key: [{component, relic, drop_rate}]}
+    first_sightings = {}  # {(mission, planet, rotation): première farm vue}
+    multi_sightings = {}  # {(mission, planet, rotation): [farm, ...]} seulement si >= 2 farms
     
-    for component in valid_parts:
-        comp_short = component.replace(f"{base_name} ", "")
-        
-        # Trouve les reliques
-        relics = analyzer.find_item_in_relics(component)
-        active_relics = [r for r, d in relics.items() if not analyzer.is_relic_vaulted(d)]
-        
+    # Les filtres sont appliqués dès la collecte : les farms exclues ne sont ni copiées
+    # ni agrégées en aval
+    keep = source.build_filter_predicate(filters)
+    
+    # Analyse les composants en parallèle dans ANALYZER_POOL (les recherches sont bloquantes)
+    results = await asyncio.gather(*(
+        run_analyzer(_scan_component, source, component, part, relics, generation, keep)
+        for component, part, relics in valid_parts
+    ))
+    
+    # Fusionne les résultats dans l'ordre des composants
+    for component, active_relics, all_farms, top_farms in results:
         if not active_relics:
             continue
         
-        # Collecte les farms avec rareté de l'item
-        all_farms = []
-        for relic in active_relics:
-            farms = analyzer.find_relic_farm_locations(relic)
-            # Récupère la rareté de l'item dans cette relique
-            relic_info = relics.get(relic, {})
-            item_rarity = relic_info.get('rarity', 'Unknown')
-            item_rarity_chance = relic_info.get('rarity_chance', 0.0)
+        for farm in all_farms:
+            all_farms_list.append(farm)
             
-            for farm in farms:
-                farm['relic'] = relic
-                farm['component'] = comp_short
-                farm['item_rarity'] = item_rarity
-                farm['item_rarity_chance'] = item_rarity_chance
-                all_farms.append(farm)
-                all_farms_list.append(farm)
-                
-                # Track pour missions communes avec détails (stocke TOUTES les infos pour filtrage)
-                mission_key = f"{farm['mission']}|{farm['planet']}|{farm['rotation']}"
-                mission_components_detailed[mission_key].append({
-                    'component': comp_short,
-                    'relic': relic,
-                    'drop_rate': farm['drop_rate'],
-                    'item_rarity': item_rarity,
-                    'item_rarity_chance': item_rarity_chance,
-                    'mission': farm['mission'],
-                    'planet': farm['planet'],
-                    'type': farm['type'],
-                    'rotation': farm['rotation']
-                })
+            # Track pour missions communes avec détails : la farm (déjà une copie propre à
+            # cette analyse) contient toutes les infos utiles, pas besoin d'un second dict.
+            # Une liste n'est créée qu'à la deuxième farm d'une mission (les singletons
+            # ne peuvent pas être multi-composants)
+            mission_key = (farm['mission'], farm['planet'], farm['rotation'])
+            first = first_sightings.setdefault(mission_key, farm)
+            if first is not farm:
+                multi_sightings.setdefault(mission_key, [first]).append(farm)
         
         component_data[component] = {
             'relics': active_relics,
-            'farms': all_farms
+            'farms': all_farms,
+            'top_farms': top_farms
         }
     
+    # Missions vues au moins deux fois, dans l'ordre de première apparition
+    mission_components_detailed = {k: multi_sightings[k] for k in first_sightings if k in multi_sightings}
+    
     # Génère le résultat texte
+    # (component_data est mis en cache avec le texte : il n'est ensuite plus modifié)
     result = await generate_complete_analysis(
         base_name, equipment_type, all_farms_list, component_data, filters, mission_components_detailed
     )
@@ -435,93 +814,76 @@ async def generate_complete_analysis(
     filters: List[str],
     mission_components_detailed: Dict = None
 ) -> str:
-    """Génère l'analyse complète formatée"""
+    """
+    Génère l'analyse complète formatée
+    Les farms reçues sont déjà filtrées (filters ne sert qu'à l'affichage)
+    """
     
-    result = f"# 🎯 {base_name}\n\n"
-    result += f"**{len(component_data)} composants détectés**\n\n"
+    # Accumule les morceaux dans une liste (join final linéaire, pas de += quadratique)
+    out = [f"# 🎯 {base_name}\n\n"]
+    out.append(f"**{len(component_data)} composants détectés**\n\n")
     
     if filters:
-        result += f"🔍 **Filtres appliqués:** {', '.join(filters)}\n\n"
+        out.append(f"🔍 **Filtres appliqués:** {', '.join(filters)}\n\n")
     
-    # Analyse chaque composant
+    # Analyse chaque composant (les noms commencent tous par "{base_name} ")
+    prefix = f"{base_name} "
     for component, data in component_data.items():
-        comp_short = component.replace(f"{base_name} ", "")
-        result += f"## 📦 {comp_short}\n\n"
+        comp_short = component.removeprefix(prefix)
+        out.append(f"## 📦 {comp_short}\n\n")
         
         if not data['relics']:
-            result += "⚠️ Toutes les reliques sont vaulted\n\n"
+            out.append("⚠️ Toutes les reliques sont vaulted\n\n")
             continue
         
-        result += f"**Reliques:** {', '.join(data['relics'])}\n\n"
-        
-        # Filtre et agrège
-        farms = data['farms']
-        if filters:
-            farms = analyzer.apply_mission_filters(farms, filters)
-        
-        farms = analyzer.aggregate_mission_drops(farms)
-        farms.sort(key=lambda x: x['drop_rate'], reverse=True)
+        out.append(f"**Reliques:** {', '.join(data['relics'])}\n\n")
         
         # Top 3
-        for idx, farm in enumerate(farms[:3], 1):
+        for idx, farm in enumerate(data['top_farms'], 1):
             item_rarity = farm.get('item_rarity', 'Unknown')
             item_rarity_chance = farm.get('item_rarity_chance', 0.0)
-            result += f"**{idx}.** {farm['mission']} ({farm['planet']}) - {farm['type']} - {farm['rotation']}\n"
-            result += f"      Drop relique: **{farm['drop_rate']:.2f}%**"
+            out.append(f"**{idx}.** {farm['mission']} ({farm['planet']}) - {farm['type']} - {farm['rotation']}\n")
+            out.append(f"      Drop relique: **{farm['drop_rate']:.2f}%**")
             if item_rarity != 'Unknown':
-                result += f" | Item dans relique: **{item_rarity} ({item_rarity_chance:.2f}%)**"
-            result += "\n"
-        result += "\n"
-    
-    # Missions multi-composants AMÉLIORÉE (avec filtres appliqués)
-    # Applique les filtres sur all_farms_list avant de calculer les missions communes
-    filtered_farms_for_common = all_farms_list
-    if filters:
-        filtered_farms_for_common = analyzer.apply_mission_filters(all_farms_list, filters)
+                out.append(f" | Item dans relique: **{item_rarity} ({item_rarity_chance:.2f}%)**")
+            out.append("\n")
+        out.append("\n")
     
+    # Missions multi-composants AMÉLIORÉE (filtres déjà appliqués à la collecte)
     if mission_components_detailed:
-        # Filtre mission_components_detailed selon les filtres
-        filtered_detailed = {}
-        for mission_key, comp_list in mission_components_detailed.items():
-            if comp_list:
-                # Utilise directement les infos du premier composant (toutes les missions sont identiques)
-                test_mission = {
-                    'mission': comp_list[0]['mission'],
-                    'planet': comp_list[0]['planet'],
-                    'type': comp_list[0]['type'],
-                    'rotation': comp_list[0]['rotation']
-                }
-                
-                # Applique les filtres - vérifie que la mission N'EST PAS exclue
-                filtered_result = analyzer.apply_mission_filters([test_mission], filters)
-                if len(filtered_result) > 0:  # Mission NON exclue
-                    filtered_detailed[mission_key] = comp_list
-        
-        common = {k: v for k, v in filtered_detailed.items() if len(v) > 1}
+        candidates = mission_components_detailed
     else:
-        # Fallback avec filtres appliqués
+        # Fallback
         mission_comps_simple = defaultdict(list)
-        for farm in filtered_farms_for_common:
-            mission_key = f"{farm['mission']}|{farm['planet']}|{farm['rotation']}"
+        for farm in all_farms_list:
+            mission_key = (farm['mission'], farm['planet'], farm['rotation'])
             mission_comps_simple[mission_key].append(farm.get('component', ''))
-        common = {k: [{'component': c, 'relic': '', 'drop_rate': 0} for c in v]
-                  for k, v in mission_comps_simple.items() if len(v) > 1}
+        candidates = {k: [{'component': c, 'relic': '', 'drop_rate': 0} for c in v]
+                      for k, v in mission_comps_simple.items()}
+    
+    # Nombre de composants DISTINCTS par mission : un même composant obtenu via
+    # plusieurs reliques ne compte qu'une fois
+    component_counts = {k: len({d['component'] for d in v}) for k, v in candidates.items()}
+    common = {k: v for k, v in candidates.items() if component_counts[k] > 1}
     
     if common:
-        result += "## 🎁 Missions Multi-Composants\n\n"
-        result += "*Farmez plusieurs composants dans la même mission !*\n\n"
+        # Type de mission par (mission, planète) : premier farm rencontré, indexé en une passe
+        mission_types = {}
+        for farm in all_farms_list:
+            mission_types.setdefault((farm['mission'], farm['planet']), farm['type'])
         
-        for mission_key, comp_details in sorted(common.items(), key=lambda x: len(x[1]), reverse=True)[:5]:
-            parts = mission_key.split('|')
-            # Récupère le type de mission depuis le premier farm
-            mission_type = "N/A"
-            for farm in all_farms_list:
-                if farm['mission'] == parts[0] and farm['planet'] == parts[1]:
-                    mission_type = farm['type']
-                    break
+        out.append("## 🎁 Missions Multi-Composants\n\n")
+        out.append("*Farmez plusieurs composants dans la même mission !*\n\n")
+        
+        # Top 5 des missions avec le plus de composants (sélection partielle, pas de tri complet)
+        top_common = heapq.nlargest(5, common.items(), key=lambda kv: component_counts[kv[0]])
+        for mission_key, comp_details in top_common:
+            mission, planet, rotation = mission_key
+            mission_type = mission_types.get((mission, planet), "N/A")
             
-            result += f"**{parts[0]} ({parts[1]}) - {mission_type} - {parts[2]}**\n"
-            result += f"   • **{len(comp_details)} composants disponibles:**\n"
+            out.append(f"**{mission} ({planet}) - {mission_type} - {rotation}**\n")
+            n_components = component_counts[mission_key]
+            out.append(f"   • **{n_components} composants disponibles:**\n")
             
             # Affiche chaque composant avec sa relique, son taux et la rareté dans la relique
             for detail in comp_details:
@@ -530,103 +892,83 @@ async def generate_complete_analysis(
                 drop_rate = detail.get('drop_rate', 0)
                 item_rarity = detail.get('item_rarity', 'Unknown')
                 item_rarity_chance = detail.get('item_rarity_chance', 0.0)
-                result += f"      ▸ **{comp_name}** via *{relic}* ({drop_rate:.2f}%) - **{item_rarity} ({item_rarity_chance:.2f}%)**\n"
-            result += "\n"
+                out.append(f"      ▸ **{comp_name}** via *{relic}* ({drop_rate:.2f}%) - **{item_rarity} ({item_rarity_chance:.2f}%)**\n")
+            out.append("\n")
     
-    return result
+    return "".join(out)
 
 
-async def send_long_message(interaction: discord.Interaction, content: str):
-    """Envoie un message long en le découpant si nécessaire"""
-    max_length = 1900  # Limite Discord ~2000, on garde une marge
-    
-    if len(content) <= max_length:
-        await interaction.followup.send(content)
-        return
-    
-    # Découpe en plusieurs messages
-    parts = []
-    current = ""
-    
-    for line in content.split('\n'):
-        if len(current) + len(line) + 1 > max_length:
-            parts.append(current)
-            current = line + '\n'
-        else:
-            current += line + '\n'
-    
-    if current:
-        parts.append(current)
-    
-    # Envoie les parties
-    for i, part in enumerate(parts):
-        if i == 0:
-            await interaction.followup.send(part)
-        else:
-            await interaction.channel.send(part)
-        await asyncio.sleep(0.5)  # Évite le rate limit
+def split_message(content: str, max_length: int = MAX_MESSAGE_LENGTH):
+    """
+    Découpe un message en morceaux de max_length caractères maximum
+    Coupe de préférence après un saut de ligne (parcours par index, sans liste de lignes)
+    """
+    start = 0
+    n = len(content)
+    while start < n:
+        end = min(start + max_length, n)
+        if end < n:
+            cut = content.rfind('\n', start, end)
+            if cut > start:
+                end = cut + 1
+        yield content[start:end]
+        start = end
 
 
-async def send_long_message_followup(interaction: discord.Interaction, content: str):
-    """Envoie un message long via followup en le découpant si nécessaire"""
-    max_length = 1900
-    
-    if len(content) <= max_length:
-        await interaction.followup.send(content)
-        return
-    
-    # Découpe en plusieurs messages
-    parts = []
-    current = ""
-    
-    for line in content.split('\n'):
-        if len(current) + len(line) + 1 > max_length:
-            parts.append(current)
-            current = line + '\n'
-        else:
-            current += line + '\n'
-    
-    if current:
-        parts.append(current)
-    
+async def send_chunked(content: str, send_first, send_next=None):
+    """
+    Envoie un message long morceau par morceau
+    send_first envoie le premier morceau, send_next les suivants (par défaut send_first)
+    Le rate limit Discord est déjà géré par discord.py (attente sur 429)
+    """
+    send_next = send_next or send_first
+    for i, part in enumerate(split_message(content)):
+        await (send_first if i == 0 else send_next)(part)
 
 
-def generate_summary_image(item_name: str, component_data: Dict, filters: List[str]) -> io.BytesIO:
+async def send_long_message(interaction: discord.Interaction, content: str, via_channel: bool = True):
     """
-    Génère UNE image 800x400 avec grille 2x2 (4 composants)
-    En attente du template annoté pour ajustements finaux
+    Envoie un message long en le découpant si nécessaire
+    Le premier morceau part en followup, les suivants dans le salon (via_channel) ou en followup
     """
-    # Dimensions de l'image - MESURES FIGMA EXACTES
-    width, height = 800, 400
-    
-    # Dimensions des cartes - MESURES FIGMA
-    card_w, card_h = 380, 160
-    icon_size = 40
-    
-    # Positions des cartes - MESURES FIGMA
-    # Carte 1 (haut gauche) : X:10, Y:50
-    # Carte 2 (bas gauche) : X:10, Y:220
-    # Carte 3 (haut droite) : X:410, Y:50
-    # Carte 4 (bas droite) : X:410, Y:220
-    card_positions = [
-        (10, 50),    # Component 1
-        (10, 220),   # Component 2
-        (410, 50),   # Component 3
-        (410, 220)   # Component 4
-    ]
-    
-    # Couleurs du template Figma
-    bg_color = (196, 196, 196)  # Gris clair fond
-    card_color = (217, 217, 217)  # Beige/gris cartes
-    icon_bg = (255, 255, 255)  # Blanc pour icône
-    text_dark = (40, 40, 40)  # Texte foncé
-    text_light = (80, 80, 80)  # Texte secondaire
-    accent = (100, 150, 255)  # Bleu pour highlights
-    
-    # Crée l'image avec fond
-    img = Image.new('RGB', (width, height), bg_color)
-    draw = ImageDraw.Draw(img)
-    
+    send_next = interaction.channel.send if via_channel else None
+    await send_chunked(content, interaction.followup.send, send_next)
+
+
+# Image récapitulative - MESURES FIGMA EXACTES
+SUMMARY_SIZE = (800, 400)
+SUMMARY_CARD_SIZE = (380, 160)
+SUMMARY_ICON_SIZE = 40
+# Positions des cartes - MESURES FIGMA
+# Carte 1 (haut gauche) : X:10, Y:50
+# Carte 2 (bas gauche) : X:10, Y:220
+# Carte 3 (haut droite) : X:410, Y:50
+# Carte 4 (bas droite) : X:410, Y:220
+SUMMARY_CARD_POSITIONS = [
+    (10, 50),    # Component 1
+    (10, 220),   # Component 2
+    (410, 50),   # Component 3
+    (410, 220)   # Component 4
+]
+# Couleurs du template Figma
+SUMMARY_BG_COLOR = (196, 196, 196)  # Gris clair fond
+SUMMARY_CARD_COLOR = (217, 217, 217)  # Beige/gris cartes
+SUMMARY_ICON_BG = (255, 255, 255)  # Blanc pour icône
+SUMMARY_TEXT_DARK = (40, 40, 40)  # Texte foncé
+# WebP sans perte : texte net et ~5x plus léger que le PNG pour le même temps d'encodage
+# (repli PNG si Pillow est compilé sans libwebp, en zlib niveau 1 : 2x plus rapide
+# que le niveau 6 par défaut pour une taille quasi identique sur ces aplats)
+if features.check('webp'):
+    SUMMARY_IMAGE_FORMAT, SUMMARY_IMAGE_EXT = 'WEBP', 'webp'
+    SUMMARY_SAVE_OPTIONS = {'lossless': True, 'method': 4}
+else:
+    SUMMARY_IMAGE_FORMAT, SUMMARY_IMAGE_EXT = 'PNG', 'png'
+    SUMMARY_SAVE_OPTIONS = {'compress_level': 1, 'optimize': False}
+
+
+@functools.lru_cache(maxsize=1)
+def load_summary_fonts() -> tuple:
+    """Charge une seule fois les polices de l'image récapitulative (titre, composant, missions)"""
     # Polices Inter Regular - MESURES FIGMA
     try:
         font_title = ImageFont.truetype("inter/Inter-Regular.ttf", 20)  # Titre
@@ -642,6 +984,62 @@ def generate_summary_image(item_name: str, component_data: Dict, filters: List[s
             font_title = ImageFont.load_default()
             font_component = ImageFont.load_default()
             font_mission = ImageFont.load_default()
+    return font_title, font_component, font_mission
+
+
+@functools.lru_cache(maxsize=len(SUMMARY_CARD_POSITIONS) + 1)
+def summary_template(card_count: int) -> Image.Image:
+    """Fond + cartes vides (coins arrondis, carré d'icône), rendu une fois par nombre de cartes"""
+    card_w, card_h = SUMMARY_CARD_SIZE
+    icon_size = SUMMARY_ICON_SIZE
+    
+    img = Image.new('RGB', SUMMARY_SIZE, SUMMARY_BG_COLOR)
+    draw = ImageDraw.Draw(img)
+    
+    for x, y in SUMMARY_CARD_POSITIONS[:card_count]:
+        # Dessine la carte avec coins arrondis
+        draw.rounded_rectangle(
+            [(x, y), (x + card_w, y + card_h)],
+            radius=10,
+            fill=SUMMARY_CARD_COLOR
+        )
+        
+        # Carré blanc vide pour icône (haut gauche)
+        icon_x = x + 10
+        icon_y = y + 10
+        draw.rounded_rectangle(
+            [(icon_x, icon_y), (icon_x + icon_size, icon_y + icon_size)],
+            radius=5,
+            fill=SUMMARY_ICON_BG
+        )
+    
+    return img
+
+
+@functools.lru_cache(maxsize=len(SUMMARY_CARD_POSITIONS))
+def summary_card_mask(idx: int) -> Image.Image:
+    """Masque (coins arrondis) de la carte idx, pour recouvrir le texte d'une carte voisine qui déborde"""
+    card_w, card_h = SUMMARY_CARD_SIZE
+    x, y = SUMMARY_CARD_POSITIONS[idx]
+    mask = Image.new('L', SUMMARY_SIZE, 0)
+    ImageDraw.Draw(mask).rounded_rectangle(
+        [(x, y), (x + card_w, y + card_h)],
+        radius=10,
+        fill=255
+    )
+    return mask
+
+
+def generate_summary_image(item_name: str, component_data: Dict) -> io.BytesIO:
+    """
+    Génère UNE image 800x400 avec grille 2x2 (4 composants)
+    En attente du template annoté pour ajustements finaux
+    CPU uniquement (Pillow) : à appeler via asyncio.to_thread
+    """
+    width = SUMMARY_SIZE[0]
+    icon_size = SUMMARY_ICON_SIZE
+    text_dark = SUMMARY_TEXT_DARK
+    font_title, font_component, font_mission = load_summary_fonts()
     
     # Composants warframe (dans l'ordre standard)
     component_order = ['Blueprint', 'Chassis Blueprint', 'Systems Blueprint', 'Neuroptics Blueprint']
@@ -652,6 +1050,20 @@ def generate_summary_image(item_name: str, component_data: Dict, filters: List[s
         'Neuroptics Blueprint': '🧠'
     }
     
+    # Organise les composants
+    components = []
+    for comp_name in component_order:
+        for component, data in component_data.items():
+            if comp_name in component:
+                components.append((component, data))
+                break
+    components = components[:4]
+    
+    # Fond et cartes pré-rendus, seul le texte est dessiné ici
+    template = summary_template(len(components))
+    img = template.copy()
+    draw = ImageDraw.Draw(img)
+    
     # Titre centré en haut
     title_text = item_name.upper()
     draw.text(
@@ -662,34 +1074,15 @@ def generate_summary_image(item_name: str, component_data: Dict, filters: List[s
         font=font_title
     )
     
-    # Organise les composants
-    components = []
-    for comp_name in component_order:
-        for component, data in component_data.items():
-            if comp_name in component:
-                components.append((component, data))
-                break
-    
-    # Dessine les 4 cartes avec positions FIGMA exactes
-    for idx, (component, data) in enumerate(components[:4]):
+    # Remplit les 4 cartes avec positions FIGMA exactes
+    for idx, (component, data) in enumerate(components):
         # Position exacte selon Figma
-        x, y = card_positions[idx]
-        
-        # Dessine la carte avec coins arrondis
-        draw.rounded_rectangle(
-            [(x, y), (x + card_w, y + card_h)],
-            radius=10,
-            fill=card_color
-        )
-        
-        # Carré blanc vide pour icône (haut gauche)
+        x, y = SUMMARY_CARD_POSITIONS[idx]
+        if idx:
+            # La carte reste dessinée par-dessus le texte trop long des cartes précédentes
+            img.paste(template, (0, 0), summary_card_mask(idx))
         icon_x = x + 10
         icon_y = y + 10
-        draw.rounded_rectangle(
-            [(icon_x, icon_y), (icon_x + icon_size, icon_y + icon_size)],
-            radius=5,
-            fill=icon_bg
-        )
         
         # Nom du composant (à droite de l'icône) - format : {Component name}
         comp_short = component.split(' ')[-2] if 'Blueprint' in component else component.split(' ')[-1]
@@ -702,17 +1095,13 @@ def generate_summary_image(item_name: str, component_data: Dict, filters: List[s
             font=font_component
         )
         
-        # Filtre et trie les missions
-        farms = data['farms']
-        if filters:
-            farms = analyzer.apply_mission_filters(farms, filters)
-        farms = analyzer.aggregate_mission_drops(farms)
-        farms.sort(key=lambda x: x['drop_rate'], reverse=True)
+        # Top 3 déjà calculé dans ANALYZER_POOL par _scan_component (farms filtrées à la collecte)
+        top_farms = data['top_farms']
         
         # TOP 3 missions - Format Figma : "Relic Axi A1 - Mission Lieu, PLANETE : 14,88% , Rare(2%)"
         missions_y = icon_y + icon_size + 10
         
-        for i, farm in enumerate(farms[:3]):
+        for i, farm in enumerate(top_farms):
             mission_y = missions_y + i * 30  # Espacement entre lignes
             
             # Récupère les données
@@ -737,16 +1126,42 @@ def generate_summary_image(item_name: str, component_data: Dict, filters: List[s
     
     # Sauvegarde en BytesIO
     buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
+    img.save(buffer, format=SUMMARY_IMAGE_FORMAT, **SUMMARY_SAVE_OPTIONS)
     buffer.seek(0)
     return buffer
 
-async def send_summary_images(interaction: discord.Interaction, item_name: str, component_data: Dict, filters: List[str]):
-    """Génère et envoie l'image récapitulative 800x400 avec 4 composants"""
+def start_summary_render(
+    item_name: str, equipment_type: str, component_data: Dict, filters: List[str], generation: int
+) -> asyncio.Task:
+    """
+    Lance le rendu de l'image récapitulative (ou sa lecture en cache), sans l'attendre
+    generation : génération des droptables dont provient component_data
+    """
+    return asyncio.create_task(_render_summary_image(item_name, equipment_type, component_data, filters, generation))
+
+
+async def _render_summary_image(
+    item_name: str, equipment_type: str, component_data: Dict, filters: List[str], generation: int
+) -> io.BytesIO:
+    """
+    Image encodée mise en cache avec les analyses (même clé, vidée au /reload)
+    La clé porte la génération de component_data, pas celle du moment du rendu
+    """
+    key = analysis_cache_key('image', item_name, equipment_type, filters, generation)
+    data = get_cached_analysis(key)
+    if data is None:
+        img = await asyncio.to_thread(generate_summary_image, item_name, component_data)
+        data = cache_analysis(key, img.getvalue())
+    # Un BytesIO neuf par envoi : discord.File lit (et ferme) le flux
+    return io.BytesIO(data)
+
+
+async def send_summary_images(interaction: discord.Interaction, item_name: str, rendering: asyncio.Task):
+    """Attend le rendu de l'image récapitulative 800x400 (4 composants) et l'envoie"""
     try:
-        # Génère 1 image 800x400 avec grille 2x2
-        img = generate_summary_image(item_name, component_data, filters)
-        filename = f"{item_name.replace(' ', '_')}_recap.png"
+        # 1 image 800x400 avec grille 2x2
+        img = await rendering
+        filename = f"{item_name.replace(' ', '_')}_recap.{SUMMARY_IMAGE_EXT}"
         
         await interaction.followup.send(
             content="📊 **Récapitulatif**",
@@ -764,6 +1179,14 @@ def main():
         print("Définissez-la avec: set DISCORD_BOT_TOKEN=votre_token")
         return
     
+    # Boucle uvloop (libuv) si disponible : E/S réseau plus rapides, sinon boucle asyncio standard
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        print("⚡ Boucle d'événements uvloop activée")
+    except ImportError:
+        pass
+    
     print("🚀 Démarrage du bot Warframe Drop Analyzer...")
     bot.run(TOKEN)
 
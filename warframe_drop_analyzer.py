@@ -7,6 +7,12 @@ Analyse les drop rates officiels de Warframe pour trouver les meilleures mission
 
 import sys
 import io
+import os
+import json
+import hashlib
+import pickle
+import time
+import functools
 
 # Force UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -14,41 +20,355 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup  # type: ignore
 import re
-from collections import defaultdict
-from typing import List, Dict, Tuple
+from html import unescape
+from collections import defaultdict, Counter
+from operator import itemgetter
+from typing import List, Dict, Tuple, Callable
 import warnings
 
 # Supprime les avertissements SSL
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
+# Parser HTML : lxml (C, bien plus rapide) si installé, sinon html.parser (pur Python)
+try:
+    import lxml  # type: ignore  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Extraction du texte : selectolax (Lexbor, C) si installé, sans construire d'arbre Python comme BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except ImportError:
+    LexborHTMLParser = None
+# Extracteur utilisé : fait partie de la clé des index enregistrés sur disque
+TEXT_EXTRACTOR = 'selectolax' if LexborHTMLParser is not None else 'beautifulsoup'
+
+# Expressions régulières des droptables (compilées une fois)
+# Ligne de récompense de relique : "Lith X1 Relic (Intact)"
+RELIC_REWARD_RE = re.compile(r'(Lith|Meso|Neo|Axi)\s+([A-Z]\d+)\s+Relic\s+\((Intact|Exceptional|Flawless|Radiant)\)')
+REFINEMENT_TAG_RE = re.compile(r'\((Intact|Exceptional|Flawless|Radiant)\)')
+# Nom canonique d'une relique ("Lith A1") et ses mentions dans le texte ("Lith A1 Relic")
+RELIC_NAME_RE = re.compile(r'(?:Lith|Meso|Neo|Axi) [A-Z]\d+')
+RELIC_MENTION_RE = re.compile(r'((?:Lith|Meso|Neo|Axi) [A-Z]\d+) Relic')
+# Drop de relique dans une mission : "Lith A10 RelicUncommon (14.29%)" (sans espace!)
+RELIC_DROP_RE = re.compile(r'((?:Lith|Meso|Neo|Axi) [A-Z]\d+) Relic(Rare|Uncommon|Common|Very Common)\s*\(([0-9.]+)%\)')
+# Découpage par mission (Planète/Mission (Type)) puis par rotation
+MISSION_SPLIT_RE = re.compile(r'([^/\n]+)/([^\(\n]+)\s*\(([^\)]+)\)')
+ROTATION_SPLIT_RE = re.compile(r'Rotation ([ABC])')
+# Entités HTML ("&#39;", "&nbsp;", ...) : décodées comme le fait la sérialisation de BeautifulSoup,
+# qui ne garde échappés que &, < et >
+HTML_ENTITY_RE = re.compile(r'&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);')
+MINIMAL_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;'}
+
+# Clé de tri par taux de drop (itemgetter est implémenté en C, plus rapide qu'une lambda)
+BY_DROP_RATE = itemgetter('drop_rate')
+
+
+# Motifs dépendant d'un nom : compilés une fois par nom (lru_cache plutôt que le cache borné de re)
+@functools.lru_cache(maxsize=256)
+def item_rarity_pattern(item_name: str) -> re.Pattern:
+    """Rareté d'un item dans une ligne de récompense ("Item NameRare (2.00%)"), compilée une fois par nom"""
+    return re.compile(rf'{re.escape(item_name)}\s*(Common|Uncommon|Rare)\s*\(([0-9.]+)%\)')
+
+
+@functools.lru_cache(maxsize=256)
+def relic_drop_pattern(relic_name: str) -> re.Pattern:
+    """Drop d'une relique hors format standard ("Nom RelicRare (x%)"), compilé une fois par nom"""
+    return re.compile(rf'{re.escape(relic_name + " Relic")}(Rare|Uncommon|Common|Very Common)\s*\(([0-9.]+)%\)')
+
+
+@functools.lru_cache(maxsize=256)
+def mod_drop_pattern(mod_name: str) -> re.Pattern:
+    """Drop d'un mod dans le HTML brut ("Mod | Rareté (x%)"), insensible à la casse, compilé une fois par nom"""
+    return re.compile(
+        rf'{re.escape(mod_name)}\s*\|\s*(Very Common|Common|Uncommon|Rare|Ultra Rare|Legendary)\s*\(([0-9.]+)%\)',
+        re.IGNORECASE
+    )
+
+
+def decode_html_entity(match: re.Match) -> str:
+    """Décode une entité HTML (HTML_ENTITY_RE), en gardant &, < et > échappés comme BeautifulSoup"""
+    char = unescape(match.group(0))
+    return MINIMAL_ESCAPES.get(char, char)
+
+
 # URL officielle des droptables
 DROPTABLES_URL = "https://warframe-web-assets.nyc3.cdn.digitaloceanspaces.com/uploads/cms/hnfvc0o3jnfvc873njb03enrf56.html"
 
+# Copie locale des droptables et de ses validateurs HTTP (ETag / Last-Modified)
+# Réutilisée telle quelle tant qu'elle est récente, puis quand le serveur répond 304 Not Modified :
+# pas de re-téléchargement au redémarrage
+DROPTABLES_CACHE_PATH = os.getenv('DROPTABLES_CACHE_PATH', 'droptables_cache.html')
+DROPTABLES_CACHE_META_PATH = DROPTABLES_CACHE_PATH + '.json'
+# Durée (secondes) pendant laquelle la copie locale est utilisée sans même interroger le serveur
+DROPTABLES_CACHE_TTL = int(os.getenv('DROPTABLES_CACHE_TTL', 6 * 3600))
+
+# Index déjà construits pour la copie locale (évite le parsing BeautifulSoup au redémarrage)
+# Fichier écrit uniquement par ce module ; invalidé par l'empreinte du HTML et INDEX_FORMAT_VERSION
+DROPTABLES_INDEX_PATH = DROPTABLES_CACHE_PATH + '.index.pickle'
+INDEX_FORMAT_VERSION = 2  # À incrémenter à chaque changement de build_indexes
+INDEX_ATTRS = ('reward_lines', 'relic_drop_mentions', 'relic_farms', 'farm_segments', 'mod_segments')
+
+
+# Session HTTP partagée : le pool de connexions (TCP + TLS) est réutilisé d'un rechargement à l'autre
+# Les erreurs passagères du CDN (connexion, 502/503/504) sont retentées avec un délai croissant
+# (gzip est négocié par défaut par requests : Accept-Encoding: gzip, deflate)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+))
+
 
 class WarframeDropAnalyzer:
     """Analyseur de drops Warframe"""
     
-    def __init__(self):
+    def __init__(self, session: requests.Session = None):
+        self.session = session or HTTP_SESSION
         self.html_content = None
-        self.soup = None
         
-    def fetch_droptables(self):
-        """Récupère le contenu HTML des droptables officielles"""
-        print(f"📥 Récupération des droptables depuis {DROPTABLES_URL}...")
+        # Index construits une seule fois par chargement (voir build_indexes)
+        self.indexed = False
+        self.reward_lines: List[Tuple[str, str, str]] = []  # (ligne, relique, raffinement)
+        self.relic_drop_mentions: Dict[str, int] = {}       # {relique: nb de lignes de drop}
+        self.relic_farms: Dict[str, List[Dict]] = {}        # {relique: [lieux de farm]}
+        self.farm_segments: List[Tuple[str, str, str, str, str]] = []  # missions du texte
+        self.mod_segments: List[Tuple[str, str, str, str, str]] = []   # missions du HTML brut
+        
+    def fetch_droptables(self, force: bool = False):
+        """
+        Récupère le contenu HTML des droptables officielles
+        
+        Args:
+            force: Ignore la durée de validité de la copie locale (revalide auprès du serveur)
+        """
         try:
-            # Désactive la vérification SSL si nécessaire (uniquement pour ce site officiel)
-            response = requests.get(DROPTABLES_URL, timeout=30, verify=False)
-            response.raise_for_status()
-            self.html_content = response.text
-            self.soup = BeautifulSoup(self.html_content, 'html.parser')
+            cached_html, validators = self._load_cached_droptables()
+            
+            if cached_html is not None and not force and self._cached_droptables_age() < DROPTABLES_CACHE_TTL:
+                # Copie récente : aucune requête réseau
+                print("♻️  Copie locale récente, utilisation sans téléchargement")
+                self.html_content = cached_html
+            else:
+                print(f"📥 Récupération des droptables depuis {DROPTABLES_URL}...")
+                # Requête conditionnelle si une copie locale existe
+                # Désactive la vérification SSL si nécessaire (uniquement pour ce site officiel)
+                response = self.session.get(DROPTABLES_URL, timeout=30, verify=False, headers=validators)
+                if response.status_code == 304 and cached_html is not None:
+                    print("♻️  Droptables inchangées, utilisation de la copie locale")
+                    self.html_content = cached_html
+                    self._touch_cached_droptables()
+                else:
+                    response.raise_for_status()
+                    self.html_content = response.text
+                    self._save_cached_droptables(response)
+            digest = hashlib.sha1(self.html_content.encode('utf-8')).hexdigest()
+            if self._load_cached_indexes(digest):
+                print("♻️  Index des droptables rechargés depuis le disque")
+            else:
+                self.build_indexes(*self._extract_text_and_html())
+                self._save_cached_indexes(digest)
             print("✅ Droptables récupérées avec succès!\n")
             return True
         except Exception as e:
             print(f"❌ Erreur lors de la récupération: {e}")
             return False
     
+    def _load_cached_droptables(self) -> Tuple[str, Dict[str, str]]:
+        """
+        Charge la copie locale des droptables
+        
+        Returns:
+            Tuple (html, en-têtes conditionnels), ou (None, {}) si absente ou illisible
+        """
+        try:
+            with open(DROPTABLES_CACHE_META_PATH, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(DROPTABLES_CACHE_PATH, encoding='utf-8') as f:
+                html = f.read()
+        except (OSError, ValueError):
+            return None, {}
+        
+        validators = {}
+        if meta.get('etag'):
+            validators['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            validators['If-Modified-Since'] = meta['last_modified']
+        return html, validators
+    
+    def _cached_droptables_age(self) -> float:
+        """Âge (secondes) de la copie locale, infini si absente"""
+        try:
+            return time.time() - os.path.getmtime(DROPTABLES_CACHE_PATH)
+        except OSError:
+            return float('inf')
+    
+    def _touch_cached_droptables(self):
+        """Repart pour une durée de validité complète après une revalidation 304"""
+        try:
+            os.utime(DROPTABLES_CACHE_PATH)
+        except OSError:
+            pass
+    
+    def _save_cached_droptables(self, response):
+        """Enregistre les droptables téléchargées et leurs validateurs HTTP (sans bloquer en cas d'erreur)"""
+        meta = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        try:
+            # Écriture atomique : un redémarrage pendant l'écriture ne laisse pas de fichier tronqué
+            tmp_path = DROPTABLES_CACHE_PATH + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.html_content)
+            os.replace(tmp_path, DROPTABLES_CACHE_PATH)
+            with open(DROPTABLES_CACHE_META_PATH, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            print(f"⚠️  Impossible d'enregistrer la copie locale des droptables: {e}")
+    
+    def _load_cached_indexes(self, digest: str) -> bool:
+        """
+        Recharge les index enregistrés pour ce HTML (empreinte SHA-1), False si absents ou périmés
+        Un fichier illisible ou corrompu (quelle que soit l'erreur) est traité comme absent :
+        les index sont alors reconstruits depuis le HTML
+        """
+        try:
+            with open(DROPTABLES_INDEX_PATH, 'rb') as f:
+                cached = pickle.load(f)
+            if (cached.get('version') != INDEX_FORMAT_VERSION or cached.get('digest') != digest
+                    or cached.get('extractor') != TEXT_EXTRACTOR):
+                return False
+            indexes = {attr: cached['indexes'][attr] for attr in INDEX_ATTRS}
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"⚠️  Index des droptables illisibles, reconstruction: {e}")
+            return False
+        
+        for attr, value in indexes.items():
+            setattr(self, attr, value)
+        self.indexed = True
+        return True
+    
+    def _save_cached_indexes(self, digest: str):
+        """Enregistre les index construits (écriture atomique, sans bloquer en cas d'erreur)"""
+        cached = {
+            'version': INDEX_FORMAT_VERSION,
+            'digest': digest,
+            'extractor': TEXT_EXTRACTOR,
+            'indexes': {attr: getattr(self, attr) for attr in INDEX_ATTRS}
+        }
+        try:
+            tmp_path = DROPTABLES_INDEX_PATH + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, DROPTABLES_INDEX_PATH)
+        except OSError as e:
+            print(f"⚠️  Impossible d'enregistrer les index des droptables: {e}")
+    
+    def _extract_text_and_html(self) -> Tuple[str, str]:
+        """
+        Extrait le texte des droptables et le HTML sur lequel découper les mods
+        
+        Returns:
+            (texte, html) : avec selectolax le HTML est le contenu téléchargé aux entités décodées,
+            avec BeautifulSoup c'est l'arbre re-sérialisé ; les mods y sont trouvés de la même façon
+        """
+        if LexborHTMLParser is not None:
+            html = HTML_ENTITY_RE.sub(decode_html_entity, self.html_content)
+            return LexborHTMLParser(self.html_content).root.text(), html
+        soup = BeautifulSoup(self.html_content, HTML_PARSER)
+        return soup.get_text(), str(soup)
+    
+    def build_indexes(self, text: str, html: str):
+        """
+        Parcourt les droptables une seule fois et construit les index utilisés par les recherches
+        (lignes de récompense, mentions de drop, lieux de farm par relique,
+        segments mission/rotation pour les mods)
+        
+        Args:
+            text: Texte des droptables (sans balises)
+            html: HTML des droptables
+        """
+        
+        # Une seule passe sur les lignes :
+        # - lignes de récompense : première relique raffinée citée sur la ligne
+        # - lignes de drop (pourcentage, sans raffinement) : chaque relique citée compte une fois par ligne
+        self.reward_lines = []
+        drop_mentions = defaultdict(int)
+        for line in text.split('\n'):
+            relic_match = RELIC_REWARD_RE.search(line)
+            if relic_match:
+                relic_name = f"{relic_match.group(1)} {relic_match.group(2)}"
+                self.reward_lines.append((line, relic_name, relic_match.group(3)))
+            elif '%' in line and not REFINEMENT_TAG_RE.search(line):
+                for relic_name in set(RELIC_MENTION_RE.findall(line)):
+                    drop_mentions[relic_name] += 1
+        self.relic_drop_mentions = dict(drop_mentions)
+        
+        # Lieux de farm de toutes les reliques, dans l'ordre du document
+        self.farm_segments = self._split_mission_rotations(text, ('Relics', 'Event', 'Baro'), 'Reward')
+        relic_farms = defaultdict(list)
+        for planet, mission, mission_type, rotation, part in self.farm_segments:
+            for match in RELIC_DROP_RE.finditer(part):
+                relic_farms[match.group(1)].append({
+                    'mission': mission,
+                    'planet': planet,
+                    'type': mission_type,
+                    'rotation': rotation,
+                    'rarity': match.group(2),
+                    'drop_rate': float(match.group(3))
+                })
+        self.relic_farms = dict(relic_farms)
+        
+        # Segments des mods : sur le HTML brut, uniquement le contenu qui suit une rotation
+        self.mod_segments = [
+            segment for segment in self._split_mission_rotations(html, ('Relics', 'Event', 'Baro', 'Rotation'), None)
+            if segment[3] is not None
+        ]
+        self.indexed = True
+    
+    @staticmethod
+    def _split_mission_rotations(text: str, skipped_planets: Tuple[str, ...], default_rotation):
+        """
+        Découpe le texte par mission puis par rotation
+        
+        Returns:
+            Liste de (planète, mission, type, rotation, contenu) ; rotation vaut default_rotation
+            pour le contenu qui précède la première rotation
+        """
+        segments = []
+        missions = MISSION_SPLIT_RE.split(text)
+        
+        # Les groupes capturés sont à i, i+1, i+2, le contenu à i+3
+        for i in range(1, len(missions) - 3, 4):
+            planet = missions[i].strip()
+            if planet in skipped_planets:
+                continue
+            mission = missions[i+1].strip()
+            mission_type = missions[i+2].strip()
+            
+            # Les rotations sont aux indices impairs, leur contenu suit
+            current_rotation = default_rotation
+            for j, part in enumerate(ROTATION_SPLIT_RE.split(missions[i+3])):
+                if j % 2 == 1:
+                    current_rotation = part.strip()
+                    continue
+                segments.append((planet, mission, mission_type, current_rotation, part))
+        
+        return segments
+    
+    def is_ready(self) -> bool:
+        """Indique si les droptables sont chargées et prêtes à être analysées"""
+        return self.indexed
+    
     def find_item_in_relics(self, item_name: str) -> Dict[str, Dict]:
         """
         Trouve toutes les reliques contenant un item donné
@@ -56,39 +376,34 @@ class WarframeDropAnalyzer:
         """
         print(f"🔍 Recherche de '{item_name}' dans les reliques...")
         
-        # Compte les mentions de chaque relique
-        relic_data = defaultdict(lambda: {'reward_mentions': 0, 'drop_mentions': 0, 'rarity': None, 'rarity_chance': 0.0})
-        
-        # Cherche toutes les lignes contenant l'item
-        text = self.soup.get_text()
-        lines = text.split('\n')
+        # Compteurs à plat (un seul accès par incrément), assemblés en dicts à la fin
+        reward_counts = Counter()
+        rarities = {}  # {relique: (rareté, chance)} pour la version Intact
         
         # Première passe : compter les mentions dans les tableaux de récompenses des reliques + extraire la rareté INTACT
-        for line in lines:
+        # (seules les lignes de récompense indexées au chargement peuvent correspondre)
+        rarity_re = item_rarity_pattern(item_name)
+        for line, relic_name, refinement in self.reward_lines:
             if item_name in line:
-                # Extrait le nom de la relique si présent (format: "Lith X1 Relic (Intact)")
-                relic_match = re.search(r'(Lith|Meso|Neo|Axi)\s+([A-Z]\d+)\s+Relic\s+\((Intact|Exceptional|Flawless|Radiant)\)', line)
-                if relic_match:
-                    relic_name = f"{relic_match.group(1)} {relic_match.group(2)}"
-                    refinement = relic_match.group(3)  # Intact, Exceptional, Flawless, ou Radiant
-                    relic_data[relic_name]['reward_mentions'] += 1
-                    
-                    # Extrait la rareté UNIQUEMENT pour les reliques Intact (probabilités de base)
-                    if refinement == 'Intact':
-                        # Format: "Item NameCommon" ou "Item NameUncommon (11.00%)" ou "Item NameRare (2.00%)"
-                        rarity_pattern = rf'{re.escape(item_name)}\s*(Common|Uncommon|Rare)\s*\(([0-9.]+)%\)'
-                        rarity_match = re.search(rarity_pattern, line)
-                        if rarity_match:
-                            relic_data[relic_name]['rarity'] = rarity_match.group(1)
-                            relic_data[relic_name]['rarity_chance'] = float(rarity_match.group(2))
-        
-        # Deuxième passe : compter combien de fois chaque relique apparaît comme drop (avec son nom + "Relic")
-        for relic_name in relic_data.keys():
-            search_pattern = f"{relic_name} Relic"
-            for line in lines:
-                # Ne compte que si c'est une ligne de drop (contient un pourcentage)
-                if search_pattern in line and '%' in line and not re.search(r'\((Intact|Exceptional|Flawless|Radiant)\)', line):
-                    relic_data[relic_name]['drop_mentions'] += 1
+                reward_counts[relic_name] += 1
+                
+                # Extrait la rareté UNIQUEMENT pour les reliques Intact (probabilités de base)
+                if refinement == 'Intact':
+                    # Format: "Item NameCommon" ou "Item NameUncommon (11.00%)" ou "Item NameRare (2.00%)"
+                    rarity_match = rarity_re.search(line)
+                    if rarity_match:
+                        rarities[relic_name] = (rarity_match.group(1), float(rarity_match.group(2)))
+        
+        # Deuxième passe : nombre de lignes de drop (avec son nom + "Relic"), compté au chargement
+        relic_data = {}
+        for relic_name, reward_count in reward_counts.items():
+            rarity, rarity_chance = rarities.get(relic_name, (None, 0.0))
+            relic_data[relic_name] = {
+                'reward_mentions': reward_count,
+                'drop_mentions': self.relic_drop_mentions.get(relic_name, 0),
+                'rarity': rarity,
+                'rarity_chance': rarity_chance
+            }
         
         if relic_data:
             print(f"✅ Trouvé dans {len(relic_data)} relique(s):\n")
@@ -108,7 +423,7 @@ class WarframeDropAnalyzer:
         else:
             print(f"❌ '{item_name}' non trouvé dans les reliques")
         
-        return dict(relic_data)
+        return relic_data
     
     def is_relic_vaulted(self, relic_data: Dict) -> bool:
         """
@@ -124,65 +439,24 @@ class WarframeDropAnalyzer:
         """
         print(f"\n🗺️  Recherche des lieux de farm pour '{relic_name} Relic'...")
         
-        farm_locations = []
-        text = self.soup.get_text()
-        
-        # Le HTML colle tout sur une ligne, on doit chercher autrement
-        # Pattern: Planète/Mission (Type)...Rotation X...Nom RelicRarity (X.XX%)
-        # Exemple dans le texte: "Mercury/Suisei (Spy)Rotation A...Rotation BLith A10 RelicUncommon (14.29%)"
-        
-        # Découpe par mission (cherche les patterns Planète/Mission (Type))
-        mission_pattern = r'([^/\n]+)/([^\(\n]+)\s*\(([^\)]+)\)'
-        missions = re.split(mission_pattern, text)
-        
-        # Parcours les missions trouvées
-        for i in range(1, len(missions), 4):  # Les groupes capturés sont à i, i+1, i+2, le contenu à i+3
-            if i+3 >= len(missions):
-                break
-                
-            planet = missions[i].strip()
-            mission = missions[i+1].strip()
-            mission_type = missions[i+2].strip()
-            content = missions[i+3]
-            
-            # Ignore certaines sections (pas de vraies missions)
-            if planet in ['Relics', 'Event', 'Baro']:
-                continue
-            
-            # Cherche la relique dans le contenu de cette mission
-            # Pattern: Rotation X...Nom RelicRarity (X.XX%)
-            # On divise par rotation
-            rotations = re.split(r'Rotation ([ABC])', content)
-            
-            current_rotation = None
-            for j, part in enumerate(rotations):
-                # Les rotations sont aux indices impairs
-                if j % 2 == 1:
-                    current_rotation = part.strip()
-                    continue
-                
-                # Cherche la relique dans cette partie
-                # Pattern: "Lith A10 Relic" suivi de "Uncommon (14.29%)" ou "Rare (X.XX%)" etc
-                relic_full_name = f"{relic_name} Relic"
-                if relic_full_name in part:
-                    # Extrait le taux de drop qui suit immédiatement
-                    # Format: "Lith A10 RelicUncommon (14.29%)" (sans espace!)
-                    pattern = rf'{re.escape(relic_full_name)}(Rare|Uncommon|Common|Very Common)\s*\(([0-9.]+)%\)'
-                    matches = re.finditer(pattern, part)
-                    
-                    for match in matches:
-                        rarity = match.group(1)
-                        drop_rate = float(match.group(2))
-                        
-                        location = {
-                            'mission': mission,
-                            'planet': planet,
-                            'type': mission_type,
-                            'rotation': current_rotation if current_rotation else 'Reward',
-                            'rarity': rarity,
-                            'drop_rate': drop_rate
-                        }
-                        farm_locations.append(location)
+        if RELIC_NAME_RE.fullmatch(relic_name):
+            # Copie des lieux indexés au chargement (l'appelant peut les enrichir)
+            farm_locations = [dict(location) for location in self.relic_farms.get(relic_name, ())]
+        else:
+            # Nom hors format standard : recherche littérale dans les segments
+            pattern = relic_drop_pattern(relic_name)
+            farm_locations = [
+                {
+                    'mission': mission,
+                    'planet': planet,
+                    'type': mission_type,
+                    'rotation': rotation,
+                    'rarity': match.group(1),
+                    'drop_rate': float(match.group(2))
+                }
+                for planet, mission, mission_type, rotation, part in self.farm_segments
+                for match in pattern.finditer(part)
+            ]
         
         if farm_locations:
             print(f"✅ Trouvé {len(farm_locations)} lieu(x) de farm\n")
@@ -191,6 +465,34 @@ class WarframeDropAnalyzer:
         
         return farm_locations
     
+    def build_filter_predicate(self, filters: List[str]) -> Callable[[dict], bool]:
+        """
+        Construit le prédicat d'exclusion une seule fois pour une liste de filtres
+        
+        Args:
+            filters: Liste des patterns à exclure
+            
+        Returns:
+            Fonction mission -> True si la mission est conservée
+        """
+        # Les termes (en minuscules) sont fusionnés en une seule alternation compilée :
+        # une recherche C par champ au lieu d'un test de sous-chaîne par terme
+        terms = sorted({f.lower() for f in filters})
+        if not terms:
+            # Aucun filtre : toutes les missions sont conservées
+            return lambda mission: True
+        search = re.compile('|'.join(map(re.escape, terms))).search
+        
+        def keep(mission: dict) -> bool:
+            # Vérifie si un filtre correspond au type, planète ou mission
+            return not (
+                search(mission.get('type', '').lower()) or
+                search(mission.get('planet', '').lower()) or
+                search(mission.get('mission', '').lower())
+            )
+        
+        return keep
+    
     def apply_mission_filters(self, missions: List[dict], filters: List[str]) -> List[dict]:
         """
         Filtre les missions en excluant celles qui correspondent aux filtres
@@ -205,21 +507,8 @@ class WarframeDropAnalyzer:
         if not filters:
             return missions
         
-        filtered = []
-        for mission in missions:
-            exclude = False
-            for filter_term in filters:
-                # Vérifie si le filtre correspond au type, planète ou mission
-                if (filter_term.lower() in mission.get('type', '').lower() or
-                    filter_term.lower() in mission.get('planet', '').lower() or
-                    filter_term.lower() in mission.get('mission', '').lower()):
-                    exclude = True
-                    break
-            
-            if not exclude:
-                filtered.append(mission)
-        
-        return filtered
+        keep = self.build_filter_predicate(filters)
+        return [mission for mission in missions if keep(mission)]
     
     def aggregate_mission_drops(self, farms: List[dict]) -> List[dict]:
         """
@@ -239,15 +528,11 @@ class WarframeDropAnalyzer:
             key = (farm['mission'], farm['planet'], farm['type'], farm['rotation'])
             
             if key not in aggregated:
-                # Première occurrence de cette mission
+                # Première occurrence de cette mission : 'relics' est toujours une liste
                 aggregated[key] = farm.copy()
                 aggregated[key]['relics'] = [farm['relic']]
             else:
                 # Mission déjà vue, ajoute la relique
-                if 'relics' not in aggregated[key]:
-                    # Convertit 'relic' (string) en 'relics' (list)
-                    aggregated[key]['relics'] = [aggregated[key].get('relic', farm['relic'])]
-                
                 if farm['relic'] not in aggregated[key]['relics']:
                     aggregated[key]['relics'].append(farm['relic'])
                 
@@ -307,7 +592,7 @@ class WarframeDropAnalyzer:
         filters_input = input("Filtres: ").strip()
         
         if filters_input:
-            excluded = [f.strip() for f in filters_input.split(',')]
+            excluded = [f.strip() for f in filters_input.split(',') if f.strip()]
             print(f"\n✅ Filtres appliqués: {', '.join(excluded)}")
         
         return excluded
@@ -331,6 +616,9 @@ class WarframeDropAnalyzer:
         print("4️⃣  Arme Secondary (pistolet, kunai, etc.)")
         print()
         
+        # Résultats déjà obtenus lors de la détection (évite de rechercher deux fois)
+        known_relics = {}
+        
         while True:
             try:
                 choice = input("Choisissez le type (1-4): ").strip()
@@ -345,8 +633,11 @@ class WarframeDropAnalyzer:
                 elif choice == '3':
                     # Melee: Blade/Hilt (Nikana Prime) ou Blade/Handle/Guard (autres)
                     # On teste d'abord Blade/Hilt, puis Blade/Handle/Guard
-                    test_parts = [f"{base_name} Blade", f"{base_name} Hilt"]
-                    if all(self.find_item_in_relics(p) for p in test_parts):
+                    for p in (f"{base_name} Blade", f"{base_name} Hilt"):
+                        known_relics[p] = self.find_item_in_relics(p)
+                        if not known_relics[p]:
+                            break
+                    if all(known_relics.values()):
                         parts = ['Blueprint', 'Blade', 'Hilt']
                     else:
                         parts = ['Blueprint', 'Blade', 'Handle', 'Guard']
@@ -365,7 +656,10 @@ class WarframeDropAnalyzer:
         valid_parts = []
         for part in parts:
             component_name = f"{base_name} {part}"
-            relics = self.find_item_in_relics(component_name)
+            if component_name in known_relics:
+                relics = known_relics[component_name]
+            else:
+                relics = self.find_item_in_relics(component_name)
             if relics:
                 valid_parts.append(component_name)
         
@@ -381,58 +675,29 @@ class WarframeDropAnalyzer:
         Returns:
             Liste des missions avec taux de drop
         """
-        if not self.soup:
+        if not self.is_ready():
             print("⚠️  Les droptables n'ont pas été chargées")
             return []
         
-        missions_text = str(self.soup)
-        
-        # Pattern pour trouver les missions
-        mission_pattern = r'([^/\n]+)/([^\(\n]+)\s*\(([^\)]+)\)'
-        missions = re.split(mission_pattern, missions_text)
+        # Cherche le mod avec son taux de drop et sa rareté dans chaque rotation indexée
+        mod_pattern = mod_drop_pattern(mod_name)
         
         farm_locations = []
-        
-        for i in range(1, len(missions), 4):
-            if i+3 > len(missions):
-                break
-            
-            planet = missions[i].strip()
-            mission = missions[i+1].strip()
-            mission_type = missions[i+2].strip()
-            content = missions[i+3]
+        for planet, mission, mission_type, rotation_letter, rotation_content in self.mod_segments:
+            mod_match = mod_pattern.search(rotation_content)
             
-            # Ignore certaines sections
-            if planet in ['Relics', 'Event', 'Baro', 'Rotation']:
-                continue
-            
-            # Cherche le mod dans le contenu avec rotation
-            rotation_pattern = r'Rotation ([ABC])'
-            rotations = re.split(rotation_pattern, content)
-            
-            for rot_idx in range(1, len(rotations), 2):
-                if rot_idx+1 > len(rotations):
-                    break
-                
-                rotation_letter = rotations[rot_idx]
-                rotation_content = rotations[rot_idx+1]
+            if mod_match:
+                rarity = mod_match.group(1)
+                drop_rate = float(mod_match.group(2))
                 
-                # Cherche le mod avec son taux de drop et sa rareté
-                mod_pattern = rf'{re.escape(mod_name)}\s*\|\s*(Very Common|Common|Uncommon|Rare|Ultra Rare|Legendary)\s*\(([0-9.]+)%\)'
-                mod_match = re.search(mod_pattern, rotation_content, re.IGNORECASE)
-                
-                if mod_match:
-                    rarity = mod_match.group(1)
-                    drop_rate = float(mod_match.group(2))
-                    
-                    farm_locations.append({
-                        'planet': planet,
-                        'mission': mission,
-                        'type': mission_type,
-                        'rotation': f"Rot. {rotation_letter}",
-                        'drop_rate': drop_rate,
-                        'rarity': rarity
-                    })
+                farm_locations.append({
+                    'planet': planet,
+                    'mission': mission,
+                    'type': mission_type,
+                    'rotation': f"Rot. {rotation_letter}",
+                    'drop_rate': drop_rate,
+                    'rarity': rarity
+                })
         
         return farm_locations
     
@@ -463,7 +728,7 @@ class WarframeDropAnalyzer:
             return
         
         # Trie par taux de drop décroissant
-        missions.sort(key=lambda x: x['drop_rate'], reverse=True)
+        missions.sort(key=BY_DROP_RATE, reverse=True)
         
         print(f"\n📋 {len(missions)} MISSIONS TROUVÉES (triées par drop rate):\n")
         print(f"{'#':<4} {'Drop%':<8} {'Mission':<30} {'Planète':<20} {'Type':<15} {'Rotation':<10}")
@@ -556,7 +821,7 @@ class WarframeDropAnalyzer:
                 all_farms = self.aggregate_mission_drops(all_farms)
                 
                 # Trier par taux de drop décroissant
-                all_farms.sort(key=lambda x: x['drop_rate'], reverse=True)
+                all_farms.sort(key=BY_DROP_RATE, reverse=True)
                 
                 print(f"\n📋 {len(all_farms)} MISSIONS TROUVÉES (triées par drop rate):\n")
                 print(f"{'#':<4} {'Drop%':<8} {'Relique(s)':<30} {'Mission':<25} {'Type':<15} {'Rotation':<10}")
@@ -580,7 +845,7 @@ class WarframeDropAnalyzer:
                     print(f"   Drop rate: {farm['drop_rate']}%")
                     
                     # Affiche les reliques (peut être plusieurs agrégées)
-                    if isinstance(farm.get('relics'), list) and len(farm['relics']) > 1:
+                    if len(farm['relics']) > 1:
                         print(f"   Reliques: {', '.join(farm['relics'])} (cumulé)")
                     else:
                         print(f"   Relique: {farm['relic']}")
@@ -664,7 +929,7 @@ class WarframeDropAnalyzer:
                     farms.append(farm)
             
             if farms:
-                farms.sort(key=lambda x: x['drop_rate'], reverse=True)
+                farms.sort(key=BY_DROP_RATE, reverse=True)
                 all_farms_by_component[component] = farms
                 for relic in active_relics:
                     if relic not in all_active_relics: